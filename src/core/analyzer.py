@@ -1,23 +1,106 @@
+import asyncio
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
 from datetime import datetime, timezone
-import torch
-from transformers import pipeline
+from itertools import islice
+from types import MappingProxyType
+import numpy as np
 from loguru import logger as log 
-from typing import Dict, Tuple, Optional, List
+from typing import TYPE_CHECKING, Awaitable, Callable, Dict, Tuple, Optional, List
 import streamlit as st
 
+# torch y transformers tardan segundos en importarse, se cargan recién al crear el analizador
+if TYPE_CHECKING:
+  import torch
+
+from .data_handler import is_review_analyzed
+from ..utils.constants import PathConfig
+
+# ========================================================================================================
+#                                        MAPEO DE SENTIMIENTOS
+# ========================================================================================================
+
+# Niveles de sentimiento del modelo con su score numérico en escala 0-4
+# Los nombres se internan para compartir una sola instancia entre miles de reseñas
+_VERY_NEGATIVE = (sys.intern("VERY_NEGATIVE"), 0.0)
+_NEGATIVE = (sys.intern("NEGATIVE"), 1.0)
+_NEUTRAL = (sys.intern("NEUTRAL"), 2.0)
+_POSITIVE = (sys.intern("POSITIVE"), 3.0)
+_VERY_POSITIVE = (sys.intern("VERY_POSITIVE"), 4.0)
+
+# Niveles indexados por id de clase del modelo (0-4) para mapear el argmax sin hashing
+_LABEL_LOOKUP = (_VERY_NEGATIVE, _NEGATIVE, _NEUTRAL, _POSITIVE, _VERY_POSITIVE)
+
+# Mapea etiquetas textuales del modelo a sentimientos consistentes
+# Se construye una sola vez a nivel de módulo y se expone de solo lectura
+_SENTIMENT_MAP = MappingProxyType({
+  # Formato estándar del modelo multilingual
+  "LABEL_0": _VERY_NEGATIVE,
+  "LABEL_1": _NEGATIVE,
+  "LABEL_2": _NEUTRAL,
+  "LABEL_3": _POSITIVE,
+  "LABEL_4": _VERY_POSITIVE,
+
+  # Variaciones en inglés
+  "Very Negative": _VERY_NEGATIVE,
+  "Negative": _NEGATIVE,
+  "Neutral": _NEUTRAL,
+  "Positive": _POSITIVE,
+  "Very Positive": _VERY_POSITIVE,
+
+  # Variaciones con mayúsculas
+  "VERY_NEGATIVE": _VERY_NEGATIVE,
+  "NEGATIVE": _NEGATIVE,
+  "NEUTRAL": _NEUTRAL,
+  "POSITIVE": _POSITIVE,
+  "VERY_POSITIVE": _VERY_POSITIVE,
+})
+
+# Tamaño de lote por defecto según dispositivo de inferencia
+GPU_BATCH_SIZE = 32
+CPU_BATCH_SIZE = 8
+
+# Intervalo mínimo en segundos entre avisos de progreso, cada aviso repinta la UI
+PROGRESS_UPDATE_INTERVAL = 0.1
+
+# Máximo de textos distintos recordados entre llamadas para no repetir inferencia
+SENTIMENT_CACHE_SIZE = 50_000
+
+# Textos sin contenido clasificable: solo espacios, puntuación, símbolos o dígitos
+_TRIVIAL_TEXT_RE = re.compile(r"^[\W\d_]*$", re.UNICODE)
+
+# Largo mínimo en caracteres para que un texto valga una inferencia
+MIN_TEXT_LENGTH = 3
+
+def _is_trivial_text(text: str) -> bool:
+  # INDICA SI UN TEXTO YA LIMPIO NO TIENE CONTENIDO QUE EL MODELO PUEDA CLASIFICAR
+  return len(text) < MIN_TEXT_LENGTH or _TRIVIAL_TEXT_RE.match(text) is not None
+
 # ========================================================================================================
 #                                           CARGAR ANALIZADOR
 # ========================================================================================================
 
-@st.cache_resource
+# Instancias ya cargadas por dispositivo, sobreviven a invalidaciones del cache de Streamlit
+_ANALYZER_INSTANCES: Dict[bool, "SentimentAnalyzer"] = {}
+
+@st.cache_resource(show_spinner=False)
 def load_analyzer(use_cpu: bool = False):
   # CARGA EL ANALIZADOR DE SENTIMIENTOS CON CACHE DE STREAMLIT
+  # Reutiliza la instancia del módulo para evitar recargar el modelo en frío
+  if use_cpu in _ANALYZER_INSTANCES:
+    return _ANALYZER_INSTANCES[use_cpu]
+
   log.info("Cargando analizador")
   try:
     analyzer = SentimentAnalyzer(use_cpu=use_cpu)
     if analyzer.nlp is None:
       log.error("Fallo inicialización del analizador")
       return None 
+    _ANALYZER_INSTANCES[use_cpu] = analyzer
     return analyzer
   except Exception as e:
     log.error(f"Error crítico cargando analizador: {e}")
@@ -31,85 +114,402 @@ class SentimentAnalyzer:
   # Analizador de sentimientos multiidioma usando modelo de Hugging Face
   # Maneja carga del modelo, análisis de texto y generación de estadísticas
   
-  def __init__(self, use_cpu: bool = False):
+  # Límite de tokens por reseña: en el corpus actual (~46k reseñas) el percentil 90
+  # de título + texto ronda los 170 palabras (~230 tokens), la atención crece con L²
+  MAX_TOKENS = 256
+  
+  def __init__(
+    self,
+    use_cpu: bool = False,
+    batch_size: Optional[int] = None,
+    compile_model: bool = True,
+    quantize_cpu: bool = True,
+    use_onnx: bool = True
+  ):
     self.model_name = "tabularisai/multilingual-sentiment-analysis"
+    self.batch_size = batch_size or CPU_BATCH_SIZE  # reseñas por lote enviadas al modelo
     self.nlp = None
+    self.label_lookup = _LABEL_LOOKUP
+    self.max_length = self.MAX_TOKENS  # límite de tokens por texto
+    self._sentiment_cache: Dict[str, Tuple[str, float]] = {}  # texto -> sentimiento ya inferido
+    # La instancia la comparten todas las sesiones y analyze_texts corre en hilos de
+    # asyncio.to_thread, el cache solo se lee y modifica con este lock tomado
+    self._cache_lock = threading.Lock()
+    self._current_batch_size = self.batch_size  # mayor lote que cupo en memoria en esta sesión
 
     try:
+      import torch
+
       # Detecta si usar CPU o GPU según disponibilidad
       device = -1 if use_cpu or not torch.cuda.is_available() else 0
       device_name = 'CPU' if device == -1 else 'GPU'
       
-      # Inicializa pipeline de transformers para clasificación de texto
-      self.nlp = pipeline(
-        "text-classification", 
-        model=self.model_name,
-        device=device,
-        truncation=True
-      )
+      # Sin tamaño explícito se usan lotes grandes en GPU y pequeños en CPU
+      if batch_size is None:
+        self.batch_size = GPU_BATCH_SIZE if device >= 0 else CPU_BATCH_SIZE
+      self._current_batch_size = self.batch_size
+      
+      if device == -1:
+        self._configure_cpu_threads()
+      
+      # En GPU se usa media precisión para reducir ancho de banda y usar tensor cores
+      # En CPU se mantiene FP32 porque BF16 solo acelera en procesadores con soporte nativo
+      torch_dtype = self._select_gpu_dtype() if device >= 0 else torch.float32
+      
+      # En CPU se prefiere ONNX Runtime si optimum está instalado
+      if use_onnx and device == -1:
+        self.nlp = self._build_onnx_pipeline()
+      
+      if self.nlp is not None:
+        log.info(f"Modelo cargado en {device_name} (ONNX Runtime)")
+      else:
+        try:
+          self.nlp = self._build_pipeline(device, torch_dtype)
+        except Exception as e:
+          if torch_dtype == torch.float32:
+            raise
+          log.warning(f"Precisión {torch_dtype} no soportada, usando FP32: {e}")
+          torch_dtype = torch.float32
+          self.nlp = self._build_pipeline(device, torch_dtype)
 
-      log.info(f"Modelo cargado en {device_name}")
+        log.info(f"Modelo cargado en {device_name} ({torch_dtype})")
+        
+        # Modo evaluación y pesos congelados: autograd nunca registra operaciones del modelo
+        # Se congela en los parámetros porque set_grad_enabled solo afecta al hilo actual
+        # y la inferencia corre en hilos de trabajo de asyncio.to_thread
+        self.nlp.model.eval()
+        self.nlp.model.requires_grad_(False)
+      
+      # Algunos tokenizers reportan un máximo centinela enorme, se acota a MAX_TOKENS
+      self.max_length = min(self.nlp.tokenizer.model_max_length, self.MAX_TOKENS)
+      
+      # Resuelve una vez las etiquetas del modelo en el orden de sus ids de clase
+      id2label = self.nlp.model.config.id2label
+      self.label_lookup = tuple(self._map_label(id2label[i]) for i in range(len(id2label)))
+
+      # Compilación solo en GPU donde fusionar kernels reduce el overhead por operación
+      compiled = compile_model and device >= 0 and self._compile_model()
+      
+      # En CPU las capas lineales se cuantizan a INT8 dinámico
+      if quantize_cpu and device == -1:
+        self._quantize_model()
+      
+      # El modelo compilado ya se calentó al verificar la compilación
+      if not compiled:
+        try:
+          self._warmup()
+        except Exception as e:
+          log.warning(f"Error calentando modelo: {e}")
     except Exception as e:
       log.error(f"Error cargando modelo: {e}")
       self.nlp = None
 
+  def _configure_cpu_threads(self):
+    # AJUSTA HILOS DE TORCH PARA INFERENCIA EN CPU EVITANDO SOBRESUSCRIPCIÓN
+    # SENTIMENT_NUM_THREADS permite fijar el valor manualmente en cada equipo
+    import torch
+
+    try:
+      num_threads = int(os.environ.get("SENTIMENT_NUM_THREADS", 0)) or min(os.cpu_count() or 4, 16)
+    except ValueError:
+      num_threads = min(os.cpu_count() or 4, 16)
+
+    torch.set_num_threads(num_threads)
+    torch.backends.mkldnn.enabled = True
+
+    # Solo se puede fijar antes del primer trabajo paralelo de torch
+    try:
+      torch.set_num_interop_threads(2)
+    except RuntimeError:
+      pass
+
+    log.info(f"Inferencia CPU con {num_threads} hilos")
+
+  @staticmethod
+  def _select_gpu_dtype() -> "torch.dtype":
+    # ELIGE BF16 EN GPUS AMPERE O SUPERIORES Y FP16 EN EL RESTO
+    # BF16 conserva el rango de FP32 y evita desbordes en logits grandes
+    import torch
+
+    try:
+      if torch.cuda.get_device_capability()[0] >= 8 and torch.cuda.is_bf16_supported():
+        return torch.bfloat16
+    except Exception as e:
+      log.debug(f"No se pudo detectar capacidad de GPU: {e}")
+    return torch.float16
+
+  def _build_pipeline(self, device: int, torch_dtype: "torch.dtype"):
+    # INICIALIZA PIPELINE DE TRANSFORMERS PARA CLASIFICACIÓN DE TEXTO
+    # Solo agrupa modelo, tokenizer y dispositivo, la inferencia pasa por _forward_batch
+    # El tokenizer rápido (Rust) se pide explícitamente para tokenizar lotes completos
+    from transformers import AutoTokenizer, pipeline
+
+    return pipeline(
+      "text-classification", 
+      model=self.model_name,
+      tokenizer=AutoTokenizer.from_pretrained(self.model_name, use_fast=True),
+      device=device,
+      truncation=True,
+      torch_dtype=torch_dtype,
+      model_kwargs={"low_cpu_mem_usage": True}
+    )
+
+  def _build_onnx_pipeline(self):
+    # CONSTRUYE PIPELINE SOBRE ONNX RUNTIME PARA INFERENCIA EN CPU
+    # Exporta el modelo una sola vez y lo reutiliza desde disco en cargas siguientes
+    # Retorna None si optimum no está instalado o la exportación falla
+    try:
+      from optimum.onnxruntime import ORTModelForSequenceClassification
+      from transformers import AutoTokenizer, pipeline
+    except ImportError:
+      log.info("optimum[onnxruntime] no instalado, se usa PyTorch en CPU")
+      return None
+
+    export_dir = PathConfig.MODELS_DIR / "onnx" / self.model_name.replace("/", "__")
+    try:
+      if (export_dir / "model.onnx").exists():
+        model = ORTModelForSequenceClassification.from_pretrained(export_dir, provider="CPUExecutionProvider")
+        tokenizer = AutoTokenizer.from_pretrained(export_dir, use_fast=True)
+      else:
+        log.info("Exportando modelo a ONNX, solo ocurre la primera vez")
+        model = ORTModelForSequenceClassification.from_pretrained(
+          self.model_name,
+          export=True,
+          provider="CPUExecutionProvider"
+        )
+        tokenizer = AutoTokenizer.from_pretrained(self.model_name, use_fast=True)
+        model.save_pretrained(export_dir)
+        tokenizer.save_pretrained(export_dir)
+
+      return pipeline(
+        "text-classification",
+        model=model,
+        tokenizer=tokenizer,
+        device=-1,
+        truncation=True
+      )
+    except Exception as e:
+      log.warning(f"Error cargando modelo ONNX, se usa PyTorch: {e}")
+      return None
+
+# ========================================================================================================
+#                                          COMPILAR MODELO
+# ========================================================================================================
+
+  def _compile_model(self) -> bool:
+    # COMPILA EL MODELO CON TORCH.COMPILE Y VUELVE A EAGER SI FALLA
+    # torch.compile es perezoso, por eso se fuerza una inferencia de calentamiento
+    # Windows no soporta el backend inductor en esta versión de torch
+    # Retorna True si el modelo quedó compilado y calentado
+    import torch
+
+    if not hasattr(torch, "compile") or sys.platform.startswith("win"):
+      log.info("torch.compile no disponible, se usa modelo sin compilar")
+      return False
+
+    # Modo por defecto con formas dinámicas: los lotes se rellenan al texto más largo y
+    # cada (lote, largo) distinto haría grabar otro CUDA graph con "reduce-overhead"
+    eager_model = self.nlp.model
+    try:
+      self.nlp.model = torch.compile(eager_model, dynamic=True, fullgraph=False)
+      self._warmup()
+      log.info("Modelo compilado con torch.compile")
+      return True
+    except Exception as e:
+      log.warning(f"Error compilando modelo, se usa modelo sin compilar: {e}")
+      self.nlp.model = eager_model
+      return False
+
+# ========================================================================================================
+#                                         CALENTAR MODELO
+# ========================================================================================================
+
+  def _warmup(self):
+    # EJECUTA INFERENCIAS DE PRUEBA POR EL MISMO CAMINO QUE EL ANÁLISIS REAL
+    # Con el modelo compilado con formas dinámicas la compilación se paga aquí, dentro
+    # de la carga cacheada por load_analyzer, y el grafo sirve para cualquier largo
+    # Un lote de uno se compila aparte porque torch especializa las dimensiones 0 y 1
+    for batch_size in (self.batch_size, 1):
+      for words in (8, self.max_length):
+        self._forward_batch(["warmup " * words] * batch_size)
+
+# ========================================================================================================
+#                                         CUANTIZAR MODELO
+# ========================================================================================================
+
+  def _quantize_model(self):
+    # CUANTIZA LAS CAPAS LINEALES DEL MODELO A INT8 PARA INFERENCIA EN CPU
+    # Los pesos quedan en INT8 y las activaciones se cuantizan al vuelo
+    # Si falla se mantiene el modelo FP32 original
+    import torch
+
+    if not isinstance(self.nlp.model, torch.nn.Module):
+      return
+
+    try:
+      self.nlp.model = torch.ao.quantization.quantize_dynamic(
+        self.nlp.model,
+        {torch.nn.Linear},
+        dtype=torch.qint8
+      )
+      log.info("Modelo cuantizado a INT8 para CPU")
+    except Exception as e:
+      log.warning(f"Error cuantizando modelo, se usa FP32: {e}")
+
 # ========================================================================================================
 #                                           ANALIZAR TEXTO
 # ========================================================================================================
 
   def analyze_text(self, text: str) -> Tuple[str, float]:
     # ANALIZA UN TEXTO Y DEVUELVE SENTIMIENTO CLASIFICADO CON SCORE NUMÉRICO
+    # Usa el mismo camino directo que el análisis por lotes con un lote de uno
+    return self.analyze_texts([text])[0] or ("ERROR", 2.0)
+
+# ========================================================================================================
+#                                       ANALIZAR TEXTOS EN LOTE
+# ========================================================================================================
+
+  def analyze_texts(self, texts: List[str]) -> List[Optional[Tuple[str, float]]]:
+    # ANALIZA VARIOS TEXTOS EN LOTES LLAMANDO AL MODELO DIRECTAMENTE
+    # Evita invocar el modelo una vez por reseña aprovechando batching
+    # Retorna resultados en el mismo orden que los textos de entrada
+    # Los textos que el modelo no pudo procesar quedan en None para reintentarlos después
     if self.nlp is None:
       log.warning("Modelo no disponible")
-      return "ERROR", 2.0
+      return [("ERROR", 2.0)] * len(texts)
 
-    try:
-      # Limita texto a 512 caracteres para evitar errores del modelo
-      processed_text = str(text).strip()[:512]
-      
-      if not processed_text:
-        return "NEUTRAL", 2.0
-        
-      result = self.nlp(processed_text)[0]
-      
-      label = result['label']
-      confidence = float(result['score'])
-      
-      # Mapea etiquetas del modelo a sentimientos consistentes
-      sentiment_mapping = {
-        # Formato estándar del modelo multilingual
-        "LABEL_0": ("VERY_NEGATIVE", 0.0),
-        "LABEL_1": ("NEGATIVE", 1.0),
-        "LABEL_2": ("NEUTRAL", 2.0),
-        "LABEL_3": ("POSITIVE", 3.0),
-        "LABEL_4": ("VERY_POSITIVE", 4.0),
-        
-        # Variaciones en inglés
-        "Very Negative": ("VERY_NEGATIVE", 0.0),
-        "Negative": ("NEGATIVE", 1.0),
-        "Neutral": ("NEUTRAL", 2.0),
-        "Positive": ("POSITIVE", 3.0),
-        "Very Positive": ("VERY_POSITIVE", 4.0),
-        
-        # Variaciones con mayúsculas
-        "VERY_NEGATIVE": ("VERY_NEGATIVE", 0.0),
-        "NEGATIVE": ("NEGATIVE", 1.0),
-        "NEUTRAL": ("NEUTRAL", 2.0),
-        "POSITIVE": ("POSITIVE", 3.0),
-        "VERY_POSITIVE": ("VERY_POSITIVE", 4.0)
-      }
-      
-      if label in sentiment_mapping:
-        sentiment_name, sentiment_value = sentiment_mapping[label]
-        log.debug(f"Texto analizado: {sentiment_name} ({sentiment_value}) confianza: {confidence:.3f}")
-        return sentiment_name, sentiment_value
+    # El largo se limita por tokens al tokenizar, no por caracteres
+    processed_texts = [str(text).strip() for text in texts]
+    results: List[Optional[Tuple[str, float]]] = [("NEUTRAL", 2.0)] * len(processed_texts)
+
+    # Textos vacíos o triviales quedan como NEUTRAL sin pasar por el modelo
+    pending_indices = [i for i, text in enumerate(processed_texts) if not _is_trivial_text(text)]
+    if not pending_indices:
+      return results
+
+    # Títulos cortos como "Great!" se repiten mucho, cada texto único se analiza una vez
+    unique_texts = list(dict.fromkeys(processed_texts[i] for i in pending_indices))
+    
+    # Los textos ya vistos en llamadas anteriores se resuelven desde el cache
+    with self._cache_lock:
+      cache = self._sentiment_cache
+      sentiment_by_text = {text: cache[text] for text in unique_texts if text in cache}
+    texts_to_infer = [text for text in unique_texts if text not in sentiment_by_text]
+    
+    # Ordena por longitud para que cada lote agrupe textos similares y se rellene poco
+    texts_to_infer.sort(key=len)
+
+    # Los ids de clase se convierten a (sentimiento, score) recién al asignar cada texto
+    label_lookup = self.label_lookup
+    start = 0
+    while start < len(texts_to_infer):
+      batch = texts_to_infer[start:start + self._current_batch_size]
+      try:
+        label_ids = self._forward_batch(batch)
+      except Exception as e:
+        # Sin memoria en GPU se reintenta el mismo tramo con la mitad del lote
+        if self._shrink_batch_on_oom(e):
+          continue
+        # Otro error se aísla texto por texto, los lotes ya resueltos se conservan
+        log.error(f"Error analizando lote de textos, se reintenta uno a uno: {e}")
+        self._forward_one_by_one(batch, sentiment_by_text)
       else:
-        log.warning(f"Label no reconocido: {label}")
-        return "NEUTRAL", 2.0
+        sentiment_by_text.update(zip(batch, map(label_lookup.__getitem__, label_ids.tolist())))
+      start += len(batch)
 
-    except Exception as e:
-      log.error(f"Error analizando texto: {e}")
-      return "ERROR", 2.0
+    for i in pending_indices:
+      results[i] = sentiment_by_text.get(processed_texts[i])
+
+    self._store_in_cache(texts_to_infer, sentiment_by_text)
+
+    skipped = len(pending_indices) - len(texts_to_infer)
+    if skipped:
+      log.debug(f"Textos resueltos sin modelo (duplicados o cache): {skipped}")
+
+    return results
+
+  def _forward_one_by_one(self, batch: List[str], sentiment_by_text: Dict[str, Tuple[str, float]]):
+    # ANALIZA CADA TEXTO DE UN LOTE FALLIDO POR SEPARADO
+    # Solo los textos que vuelven a fallar quedan sin resultado
+    label_lookup = self.label_lookup
+    for text in batch:
+      try:
+        sentiment_by_text[text] = label_lookup[int(self._forward_batch([text])[0])]
+      except Exception as e:
+        log.warning(f"Texto no analizado, se reintentará en la próxima ejecución: {e}")
+
+  def _shrink_batch_on_oom(self, error: Exception) -> bool:
+    # REDUCE A LA MITAD EL LOTE ACTUAL SI EL ERROR FUE FALTA DE MEMORIA EN GPU
+    # El tamaño reducido se conserva para las siguientes regiones de la sesión
+    import torch
+
+    if not isinstance(error, torch.cuda.OutOfMemoryError) or self._current_batch_size <= 1:
+      return False
+
+    torch.cuda.empty_cache()
+    self._current_batch_size //= 2
+    log.warning(f"Memoria GPU insuficiente, reduciendo lote a {self._current_batch_size}")
+    return True
+
+  def _store_in_cache(self, texts: List[str], sentiment_by_text: Dict[str, Tuple[str, float]]):
+    # GUARDA RESULTADOS NUEVOS EN EL CACHE ACOTADO DESCARTANDO LOS MÁS ANTIGUOS
+    with self._cache_lock:
+      cache = self._sentiment_cache
+      for text in texts:
+        if text in sentiment_by_text:
+          cache[text] = sentiment_by_text[text]
+
+      overflow = len(cache) - SENTIMENT_CACHE_SIZE
+      if overflow > 0:
+        for text in list(islice(cache, overflow)):
+          del cache[text]
+
+# ========================================================================================================
+#                                       INFERENCIA DIRECTA POR LOTE
+# ========================================================================================================
+
+  def _forward_batch(self, texts: List[str]) -> np.ndarray:
+    # TOKENIZA UN LOTE UNA SOLA VEZ Y EJECUTA EL MODELO SIN PASAR POR EL PIPELINE
+    # Omite el pre y post procesamiento por elemento del pipeline de transformers
+    # Retorna los ids de clase como arreglo int64, sin crear objetos por texto
+    import torch
+
+    model = self.nlp.model
+    
+    inputs = self.nlp.tokenizer(
+      texts,
+      padding=True,
+      truncation=True,
+      max_length=self.max_length,
+      return_tensors="pt"
+    )
+    
+    # En GPU los tensores pasan por memoria fijada para copiar de forma asíncrona
+    device = self.nlp.device
+    if device.type == "cuda":
+      inputs = {
+        name: tensor.pin_memory().to(device, non_blocking=True)
+        for name, tensor in inputs.items()
+      }
+    
+    with torch.inference_mode():
+      logits = model(**inputs).logits
+    
+    # El argmax sobre logits equivale al de softmax, no hace falta normalizar
+    return logits.argmax(dim=-1).cpu().numpy()
+
+# ========================================================================================================
+#                                          MAPEAR ETIQUETA
+# ========================================================================================================
+
+  def _map_label(self, label: str) -> Tuple[str, float]:
+    # CONVIERTE LA ETIQUETA DEL MODELO A SENTIMIENTO CONSISTENTE CON SCORE
+    mapped = _SENTIMENT_MAP.get(label)
+    if mapped is not None:
+      return mapped
+
+    log.warning(f"Label no reconocido: {label}")
+    return "NEUTRAL", 2.0
 
 # ========================================================================================================
 #                                          ANALIZAR RESEÑA
@@ -118,18 +518,8 @@ class SentimentAnalyzer:
   def analyze_review(self, title: Optional[str], text: Optional[str]) -> Tuple[str, float]:
     # ANALIZA TÍTULO Y TEXTO DE RESEÑA COMBINADOS PARA MEJOR PRECISIÓN
     try:
-      # Limpia y valida ambos campos de entrada
-      title_clean = str(title).strip() if title else ""
-      text_clean = str(text).strip() if text else ""
-
-      # Combina título y texto de manera inteligente
-      if title_clean and text_clean:
-        combined_text = f"{title_clean}. {text_clean}"
-      elif title_clean:
-        combined_text = title_clean
-      elif text_clean:
-        combined_text = text_clean
-      else:
+      combined_text = self._combine_review_text(title, text)
+      if not combined_text:
         return "NEUTRAL", 2.0
 
       # Procesa el texto combinado usando el analizador principal
@@ -139,52 +529,17 @@ class SentimentAnalyzer:
       log.error(f"Error en analyze_review: {e}")
       return "ERROR", 2.0
 
-# ========================================================================================================
-#                                      ANALIZAR RESEÑAS DE ATRACCIÓN
-# ========================================================================================================
+  @staticmethod
+  def _combine_review_text(title: Optional[str], text: Optional[str]) -> str:
+    # COMBINA TÍTULO Y TEXTO DE UNA RESEÑA EN UN SOLO STRING
+    # Limpia y valida ambos campos de entrada
+    title_clean = str(title).strip() if title else ""
+    text_clean = str(text).strip() if text else ""
 
-  async def analyze_attraction_reviews(self, attraction_data: Dict) -> Dict:
-    # PROCESA TODAS LAS RESEÑAS NO ANALIZADAS DE UNA ATRACCIÓN ESPECÍFICA
-    if self.nlp is None:
-      log.warning("Modelo no disponible")
-      return attraction_data
-    
-    analyzed_reviews = []
-    reviews = attraction_data.get("reviews", [])
-    newly_analyzed = 0
-    
-    for review in reviews:
-      # Omite reseñas que ya tienen análisis previo
-      if review.get("sentiment") and review.get("sentiment_score") is not None:
-        analyzed_reviews.append(review)
-        continue
-      
-      # Analiza reseña nueva
-      sentiment, score = self.analyze_review(
-        review.get("title"), 
-        review.get("review_text")
-      )
-      
-      # Actualiza reseña con resultados del análisis
-      updated_review = {
-        **review,
-        "sentiment": sentiment,
-        "sentiment_score": score,
-        "analyzed_at": datetime.now(timezone.utc).isoformat()
-      }
-      analyzed_reviews.append(updated_review)
-      newly_analyzed += 1
-    
-    if newly_analyzed > 0:
-      attraction_name = attraction_data.get('attraction_name', 'Atracción')
-      log.info(f"{newly_analyzed} reseñas analizadas para {attraction_name}")
-    
-    # Retorna atracción con todas las reseñas actualizadas
-    return {
-      **attraction_data,
-      "reviews": analyzed_reviews,
-      "last_analyzed_date": datetime.now(timezone.utc).isoformat()
-    }
+    # Combina título y texto de manera inteligente
+    if title_clean and text_clean:
+      return f"{title_clean}. {text_clean}"
+    return title_clean or text_clean
 
 # ========================================================================================================
 #                                       ANALIZAR RESEÑAS DE REGIÓN
@@ -193,14 +548,19 @@ class SentimentAnalyzer:
   async def analyze_region_reviews(
     self, 
     region_data: Dict, 
-    progress_callback: Optional[callable] = None
-  ) -> Dict:
+    progress_callback: Optional[callable] = None,
+    persist_callback: Optional[Callable[[int, Dict], Awaitable[None]]] = None
+  ) -> Tuple[Dict, int]:
     # PROCESA TODAS LAS RESEÑAS DE TODAS LAS ATRACCIONES EN UNA REGIÓN
+    # persist_callback recibe cada atracción modificada tras cada fragmento
+    # para guardar avance parcial y no repetir análisis si el proceso se cae
+    # La región, sus atracciones y reseñas se actualizan en su lugar sin copiarlas
+    # Retorna la misma región y cuántas reseñas se analizaron ahora
     if self.nlp is None:
       log.error("Modelo no disponible")
       if progress_callback:
         progress_callback(1.0, "Modelo no disponible")
-      return region_data
+      return region_data, 0
         
     attractions = region_data.get("attractions", [])
     total_attractions = len(attractions)
@@ -210,36 +570,78 @@ class SentimentAnalyzer:
       log.info(f"Sin atracciones en {region_name}")
       if progress_callback:
         progress_callback(1.0, "Sin atracciones")
-      return {
-        **region_data,
-        "last_analyzed_date": datetime.now(timezone.utc).isoformat()
-      }
+      region_data["last_analyzed_date"] = datetime.now(timezone.utc).isoformat()
+      return region_data, 0
+
+    # Aplana las reseñas pendientes de toda la región en una sola lista
+    # guardando su posición (atracción, reseña) para reubicar resultados
+    flat_texts: List[str] = []
+    flat_positions: List[Tuple[int, int]] = []
+    
+    for attraction_idx, attraction in enumerate(attractions):
+      reviews = attraction.get("reviews", [])
+      for review_idx, review in enumerate(reviews):
+        # Omite reseñas que ya tienen análisis previo
+        if is_review_analyzed(review):
+          continue
+        flat_texts.append(self._combine_review_text(review.get("title"), review.get("review_text")))
+        flat_positions.append((attraction_idx, review_idx))
 
-    analyzed_attractions = []
+    # Ordena por longitud antes de fragmentar para minimizar el relleno en cada lote
+    order = sorted(range(len(flat_texts)), key=lambda k: len(flat_texts[k]))
+    flat_texts = [flat_texts[k] for k in order]
+    flat_positions = [flat_positions[k] for k in order]
+
+    total_pending = len(flat_texts)
+    shard_size = max(1, self.batch_size * 4)
+    last_progress_update = 0.0
+    total_analyzed = 0
     
-    for i, attraction in enumerate(attractions):
-      attraction_name = attraction.get("attraction_name", f"Atracción #{i+1}")
+    # Procesa fragmentos grandes fuera del event loop para mantener la UI reactiva
+    for start in range(0, total_pending, shard_size):
+      shard_texts = flat_texts[start:start + shard_size]
+      shard_positions = flat_positions[start:start + shard_size]
+      shard_results = await asyncio.to_thread(self.analyze_texts, shard_texts)
+      analyzed_at = datetime.now(timezone.utc).isoformat()
       
-      # Procesa cada atracción individualmente
-      analyzed_attraction = await self.analyze_attraction_reviews(attraction)
-      analyzed_attractions.append(analyzed_attraction)
+      # Devuelve cada resultado a su reseña original
+      # Las que fallaron quedan sin sentimiento para la próxima ejecución
+      touched_attractions = set()
+      for (attraction_idx, review_idx), result in zip(shard_positions, shard_results):
+        if result is None:
+          continue
+        review = attractions[attraction_idx]["reviews"][review_idx]
+        review["sentiment"], review["sentiment_score"] = result
+        review["analyzed_at"] = analyzed_at
+        touched_attractions.add(attraction_idx)
+        total_analyzed += 1
       
-      # Actualiza callback de progreso si está disponible
-      if progress_callback:
-        progress = (i + 1) / total_attractions
-        status = f"{attraction_name} ({i+1}/{total_attractions})"
-        progress_callback(progress, status)
+      # Entrega avance parcial de las atracciones tocadas en este fragmento
+      if persist_callback:
+        for attraction_idx in sorted(touched_attractions):
+          await persist_callback(attraction_idx, attractions[attraction_idx])
+      
+      # Actualiza callback de progreso como máximo 10 veces por segundo
+      # El último fragmento siempre se informa para dejar la barra completa
+      processed = start + len(shard_texts)
+      now = time.monotonic()
+      if progress_callback and (now - last_progress_update >= PROGRESS_UPDATE_INTERVAL or processed == total_pending):
+        progress_callback(processed / total_pending, f"Reseñas analizadas ({processed}/{total_pending})")
+        last_progress_update = now
     
-    log.info(f"Análisis completado para {region_name}")
+    last_analyzed_date = datetime.now(timezone.utc).isoformat()
+    for attraction in attractions:
+      attraction["last_analyzed_date"] = last_analyzed_date
+    region_data["last_analyzed_date"] = last_analyzed_date
+    
+    log.info(f"Análisis completado para {region_name}: {total_analyzed} reseñas en {total_attractions} atracciones")
+    if total_analyzed < total_pending:
+      log.warning(f"{total_pending - total_analyzed} reseñas de {region_name} quedaron pendientes por errores del modelo")
     
     if progress_callback:
       progress_callback(1.0, f"{region_name} completado")
 
-    return {
-      **region_data,
-      "attractions": analyzed_attractions,
-      "last_analyzed_date": datetime.now(timezone.utc).isoformat()
-    }
+    return region_data, total_analyzed
 
 # ========================================================================================================
 #                                        ESTADÍSTICAS DE SENTIMIENTOS
@@ -255,25 +657,24 @@ class SentimentAnalyzer:
         "sentiment_counts": {}
       }
     
-    # Contabiliza sentimientos y scores para estadísticas
-    sentiment_counts = {}
-    sentiment_scores = []
-    
-    for review in reviews:
-      sentiment = review.get("sentiment")
-      score = review.get("sentiment_score")
-      
-      if sentiment and score is not None:
-        sentiment_counts[sentiment] = sentiment_counts.get(sentiment, 0) + 1
-        sentiment_scores.append(float(score))
+    # Filtra una sola vez las reseñas con análisis completo
+    analyzed = [
+      (review["sentiment"], review["sentiment_score"])
+      for review in reviews
+      if is_review_analyzed(review)
+    ]
+    total_analyzed = len(analyzed)
     
-    total_analyzed = len(sentiment_scores)
-    average_score = sum(sentiment_scores) / total_analyzed if sentiment_scores else 2.0
+    # Contabiliza sentimientos y scores usando Counter y NumPy en vez de bucles Python
+    sentiment_counts = dict(Counter(sentiment for sentiment, _ in analyzed))
+    sentiment_scores = np.fromiter((float(score) for _, score in analyzed), dtype=np.float64, count=total_analyzed)
+    average_score = float(sentiment_scores.mean()) if total_analyzed else 2.0
     
     # Calcula distribución porcentual de cada categoría
-    distribution = {}
-    for sentiment, count in sentiment_counts.items():
-      distribution[sentiment] = round((count / total_analyzed) * 100, 1) if total_analyzed > 0 else 0
+    distribution = {
+      sentiment: round((count / total_analyzed) * 100, 1)
+      for sentiment, count in sentiment_counts.items()
+    }
     
     return {
       "total_reviews": len(reviews),
@@ -1,12 +1,86 @@
 import asyncio
-import json
-import aiofiles
+import hashlib
+import sys
+import threading
+import time
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Optional, Any, Set, Tuple
 from datetime import datetime, timezone
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
 from loguru import logger as log
 
 from ..utils.constants import PathConfig
+from ..utils.json_io import dumps_json, read_json, write_chunks_atomic
+
+# Vigencia en segundos de la marca de tiempo reutilizada entre actualizaciones seguidas
+TIMESTAMP_CACHE_SECONDS = 0.1
+
+# Ventana en segundos para agrupar varias modificaciones en una sola escritura
+SAVE_DEBOUNCE_SECONDS = 0.5
+
+# Espera en segundos entre intentos de tomar el lock de escritura ocupado por otra sesión
+WRITE_LOCK_POLL_SECONDS = 0.01
+
+# Configuración de regiones ya parseada por (ruta, mtime_ns, tamaño) del archivo
+# Nuevas instancias de DataHandler la reutilizan mientras el archivo no cambie
+_REGIONS_CONFIG_CACHE: Dict[Tuple[str, int, int], Tuple[Mapping[str, Dict], Tuple[str, ...]]] = {}
+
+# Parámetros de seguimiento que no identifican a la atracción
+TRACKING_QUERY_PARAMS = frozenset({"ref", "fbclid", "gclid"})
+
+# ========================================================================================================
+#                                          URL CANÓNICA
+# ========================================================================================================
+
+@lru_cache(maxsize=8192)
+def canonical_url(url: Optional[str]) -> Optional[str]:
+  # NORMALIZA UNA URL PARA COMPARAR ATRACCIONES SIN IMPORTAR VARIACIONES MENORES
+  # Esquema y host en minúsculas, sin fragmento, sin barra final ni parámetros de
+  # seguimiento y con el resto de la query ordenada; la URL guardada no se modifica
+  if not url:
+    return url
+  
+  parts = urlsplit(url.strip())
+  query = sorted(
+    (key, value)
+    for key, value in parse_qsl(parts.query, keep_blank_values=True)
+    if key not in TRACKING_QUERY_PARAMS and not key.startswith("utm_")
+  )
+  path = parts.path.rstrip("/") or "/"
+  return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, urlencode(query), ""))
+
+# ========================================================================================================
+#                                          CLAVE DE RESEÑA
+# ========================================================================================================
+
+def review_key(review: Dict) -> str:
+  # GENERA UNA CLAVE ÚNICA Y ESTABLE ENTRE EJECUCIONES PARA IDENTIFICAR RESEÑAS
+  # La comparten el manejador de datos y el scraper para deduplicar igual en ambos
+  # hash() de Python cambia en cada proceso, blake2b no
+  if review_id := review.get("review_id"):
+    return f"i:{review_id}"
+  
+  # Fallback con blake2b sobre el contenido principal separado por un carácter de control
+  content = "\x1f".join((
+    (review.get('username') or '').strip().lower(),
+    (review.get('title') or '').strip().lower(),
+    str(review.get('written_date', '')),
+    str(review.get('rating', ''))
+  ))
+  return "h:" + hashlib.blake2b(content.encode("utf-8"), digest_size=8).hexdigest()
+
+# ========================================================================================================
+#                                       ESTADO DE ANÁLISIS
+# ========================================================================================================
+
+def is_review_analyzed(review: Dict) -> bool:
+  # INDICA SI UNA RESEÑA YA TIENE UN ANÁLISIS VÁLIDO Y PUEDE OMITIRSE
+  # Único criterio compartido por el analizador, los contadores y la interfaz
+  # Las marcadas como ERROR por versiones anteriores cuentan como pendientes
+  sentiment = review.get("sentiment")
+  return bool(sentiment) and sentiment != "ERROR" and review.get("sentiment_score") is not None
 
 # ========================================================================================================
 #                                            MANEJADOR DE DATOS
@@ -20,14 +94,40 @@ class DataHandler:
     self.paths = PathConfig()
     self._ensure_dirs()
     
-    # Configuración de regiones cargada desde archivo
-    self.regions_data: Dict[str, Dict] = {}
-    self.regions: List[str] = []
+    # Configuración de regiones cargada desde archivo, solo lectura tras la carga
+    self.regions_data: Mapping[str, Dict] = MappingProxyType({})
+    self.regions: Tuple[str, ...] = ()
     self._load_regions_config()
     
     # Estructura principal de datos consolidados
     self.consolidated_file: Path = self.paths.CONSOLIDATED_JSON
     self.data: Dict[str, List[Dict[str, Any]]] = self._load_data()
+    
+    # Índices en memoria para búsquedas O(1) de regiones y atracciones
+    self._region_index: Dict[str, Dict] = {}
+    self._attraction_indexes: Dict[str, Tuple[Dict[str, Dict], Dict[str, Dict]]] = {}
+    self._regions_with_data: Optional[Tuple[str, ...]] = None
+    self._build_indexes()
+    
+    # Fragmentos JSON ya serializados por región para no volver a serializar
+    # regiones sin cambios, se identifican por el objeto región que representan
+    self._region_fragments: Dict[int, Tuple[Dict, bytes]] = {}
+    self._dirty_regions: Set[str] = set()
+    
+    # Posición de cada clave de reseña por lista de reseñas ya fusionada alguna vez
+    # Se guarda fuera de las reseñas para no escribir claves internas en el JSON
+    self._review_positions: Dict[int, Tuple[List[Dict], Dict[str, int], int]] = {}
+    
+    # Última marca de tiempo ISO generada y el instante monotónico en que se generó
+    self._cached_now: Tuple[float, str] = (float("-inf"), "")
+    
+    # Estado del guardado diferido
+    # La instancia la comparten todas las sesiones de Streamlit y cada una corre su
+    # propio asyncio.run, así que el evento y la tarea de escritura van por event loop
+    # y la escritura al archivo se protege con un lock de hilos, no de asyncio
+    self._dirty = False
+    self._write_lock = threading.Lock()
+    self._loop_writers: Dict[asyncio.AbstractEventLoop, Dict[str, Any]] = {}
 
 # ========================================================================================================
 #                                         ASEGURAR DIRECTORIOS
@@ -49,26 +149,34 @@ class DataHandler:
         log.error(f"Archivo no encontrado: {self.paths.REGIONS_FILE}")
         return
 
-      with open(self.paths.REGIONS_FILE, 'r', encoding='utf-8') as f:
-        regions_list = json.load(f)
+      # Reutiliza la configuración parseada si el archivo no cambió desde la última carga
+      stat = self.paths.REGIONS_FILE.stat()
+      cache_key = (str(self.paths.REGIONS_FILE), stat.st_mtime_ns, stat.st_size)
+      cached = _REGIONS_CONFIG_CACHE.get(cache_key)
+      if cached is not None:
+        self.regions_data, self.regions = cached
+        log.info(f"Cargadas {len(self.regions)} regiones")
+        return
+
+      regions_list = read_json(self.paths.REGIONS_FILE)
 
+      # Las claves del diccionario ya son nombres únicos
+      # Los nombres se internan para que las comparaciones con los datos sean por identidad
       temp_data = {}
-      temp_names = []
-      
       for region in regions_list:
         if isinstance(region, dict) and "nombre" in region:
-          name = region["nombre"]
-          temp_data[name] = region
-          temp_names.append(name)
+          temp_data[sys.intern(region["nombre"])] = region
 
-      self.regions_data = temp_data
-      self.regions = sorted(list(set(temp_names)))
+      self.regions_data = MappingProxyType(temp_data)
+      self.regions = tuple(sorted(temp_data))
+      _REGIONS_CONFIG_CACHE.clear()
+      _REGIONS_CONFIG_CACHE[cache_key] = (self.regions_data, self.regions)
       log.info(f"Cargadas {len(self.regions)} regiones")
       
     except Exception as e:
       log.error(f"Error cargando regiones: {e}")
-      self.regions_data = {}
-      self.regions = []
+      self.regions_data = MappingProxyType({})
+      self.regions = ()
 
 # ========================================================================================================
 #                                           CARGAR DATOS
@@ -78,10 +186,12 @@ class DataHandler:
     # CARGA LOS DATOS CONSOLIDADOS DESDE EL ARCHIVO PRINCIPAL
     try:
       if self.consolidated_file.exists():
-        with open(self.consolidated_file, 'r', encoding='utf-8') as f:
-          data = json.load(f)
+        data = read_json(self.consolidated_file)
           
         if isinstance(data, dict) and "regions" in data:
+          for region in data["regions"]:
+            for attraction in region.get("attractions", []):
+              self._refresh_review_counters(attraction)
           log.info("Datos cargados desde archivo")
           return data
           
@@ -91,6 +201,45 @@ class DataHandler:
     log.info("Creando estructura nueva")
     return {"regions": []}
 
+# ========================================================================================================
+#                                          ÍNDICES EN MEMORIA
+# ========================================================================================================
+
+  def _build_indexes(self) -> None:
+    # CONSTRUYE LOS ÍNDICES DE REGIONES Y ATRACCIONES EN UNA SOLA PASADA
+    # Con nombres repetidos se conserva el primero, igual que una búsqueda lineal
+    self._region_index = {}
+    self._attraction_indexes = {}
+    self._regions_with_data = None
+    
+    for region in self.data.get("regions", []):
+      region_name = region.get("region_name")
+      if isinstance(region_name, str):
+        region_name = region["region_name"] = sys.intern(region_name)
+      if region_name in self._region_index:
+        continue
+      self._region_index[region_name] = region
+      self._index_region_attractions(region)
+
+  def _index_region_attractions(self, region_data: Dict) -> Tuple[Dict[str, Dict], Dict[str, Dict]]:
+    # INDEXA LAS ATRACCIONES DE UNA REGIÓN POR URL CANÓNICA Y POR NOMBRE
+    url_index: Dict[str, Dict] = {}
+    name_index: Dict[str, Dict] = {}
+    
+    for attraction in region_data.get("attractions", []):
+      url_index.setdefault(canonical_url(attraction.get("url")), attraction)
+      name_index.setdefault(attraction.get("attraction_name"), attraction)
+    
+    self._attraction_indexes[region_data.get("region_name")] = (url_index, name_index)
+    return url_index, name_index
+
+  def _get_attraction_indexes(self, region_data: Dict) -> Tuple[Dict[str, Dict], Dict[str, Dict]]:
+    # OBTIENE LOS ÍNDICES DE ATRACCIONES DE UNA REGIÓN CREÁNDOLOS SI FALTAN
+    indexes = self._attraction_indexes.get(region_data.get("region_name"))
+    if indexes is None:
+      indexes = self._index_region_attractions(region_data)
+    return indexes
+
 # ========================================================================================================
 #                                      OBTENER CONFIGURACIÓN
 # ========================================================================================================
@@ -105,10 +254,7 @@ class DataHandler:
 
   def get_region_data(self, region_name: str) -> Optional[Dict]:
     # OBTIENE LOS DATOS COMPLETOS DE UNA REGIÓN ESPECÍFICA
-    for region in self.data.get("regions", []):
-      if region.get("region_name") == region_name:
-        return region
-    return None
+    return self._region_index.get(region_name)
 
 # ========================================================================================================
 #                                    OBTENER REGIONES CON DATOS
@@ -116,29 +262,182 @@ class DataHandler:
 
   def get_regions_with_data(self) -> List[str]:
     # OBTIENE LA LISTA DE NOMBRES DE REGIONES QUE TIENEN DATOS
-    return [
-      region.get("region_name")
-      for region in self.data.get("regions", [])
-      if region.get("region_name")
-    ]
+    # Solo cambia al crear una región o recargar, así que se memoriza hasta entonces
+    if self._regions_with_data is None:
+      self._regions_with_data = tuple(
+        region.get("region_name")
+        for region in self.data.get("regions", [])
+        if region.get("region_name")
+      )
+    return list(self._regions_with_data)
 
 # ========================================================================================================
 #                                           GUARDAR DATOS
 # ========================================================================================================
 
-  async def save_data(self, data_to_save: Optional[Dict] = None) -> Path:
+  async def save_data(self, data_to_save: Optional[Dict] = None, region_name: Optional[str] = None) -> Path:
     # GUARDA LOS DATOS DE FORMA ASÍNCRONA EN EL ARCHIVO CONSOLIDADO
-    data = data_to_save or self.data
+    # Con region_name solo esa región se vuelve a serializar, el resto sale del cache
+    # Sin region_name se asume que cualquier parte de los datos pudo cambiar
+    data = self.data if data_to_save is None else data_to_save
     
     if "regions" not in data:
       data["regions"] = []
 
-    async with aiofiles.open(self.consolidated_file, 'w', encoding='utf-8') as f:
-      await f.write(json.dumps(data, indent=2, ensure_ascii=False))
+    if data is self.data:
+      if region_name is None:
+        self._region_fragments.clear()
+      else:
+        self._dirty_regions.add(region_name)
+    
+    return await self._write_data(data)
+
+  async def _write_data(self, data: Dict) -> Path:
+    # SERIALIZA Y ESCRIBE LOS DATOS EN DISCO
+    # El lock evita que dos guardados, de este u otro event loop, compartan el archivo
+    # temporal o el cache de fragmentos; se espera sin bloquear el loop y sin un
+    # acquire() en otro hilo que quedaría tomado si la tarea se cancela
+    while not self._write_lock.acquire(blocking=False):
+      await asyncio.sleep(WRITE_LOCK_POLL_SECONDS)
+    try:
+      # Se serializa en el event loop para que nadie modifique los datos a mitad de camino
+      # y solo la escritura a disco se delega a un hilo
+      # Los cambios hechos durante la escritura vuelven a marcar _dirty y se guardan después
+      writes_main_data = data is self.data
+      if writes_main_data:
+        self._dirty = False
+      try:
+        chunks = self._serialize_data() if writes_main_data else [dumps_json(data)]
+        await asyncio.to_thread(write_chunks_atomic, self.consolidated_file, chunks)
+      except BaseException:
+        # Si la escritura falla los cambios siguen pendientes y el próximo guardado
+        # vuelve a serializar todo, las regiones marcadas ya se consumieron
+        if writes_main_data:
+          self._dirty = True
+          self._region_fragments.clear()
+        raise
+    finally:
+      self._write_lock.release()
     
     log.info("Datos guardados")
     return self.consolidated_file
 
+# ========================================================================================================
+#                                      SERIALIZAR POR REGIÓN
+# ========================================================================================================
+
+  def _mark_region_dirty(self, region_name: str) -> None:
+    # MARCA UNA REGIÓN PARA VOLVER A SERIALIZARLA EN EL PRÓXIMO GUARDADO
+    self._dirty_regions.add(region_name)
+
+  def _serialize_data(self) -> List[bytes]:
+    # ARMA EL ARCHIVO CONSOLIDADO COMO SECUENCIA DE FRAGMENTOS POR REGIÓN
+    # Solo las regiones marcadas o nuevas pasan por el serializador
+    # Los fragmentos se escriben en orden sin unirlos en un solo bytes gigante
+    # El resultado es idéntico byte a byte a serializar el documento completo
+    regions = self.data["regions"]
+    dirty_regions = self._dirty_regions
+    self._dirty_regions = set()
+    
+    # Claves extra o lista vacía no siguen el formato fijo, se serializa todo
+    if len(self.data) != 1 or not regions:
+      self._region_fragments.clear()
+      return [dumps_json(self.data)]
+    
+    fragments = {}
+    for region in regions:
+      cached = self._region_fragments.get(id(region))
+      if cached is not None and cached[0] is region and region.get("region_name") not in dirty_regions:
+        fragments[id(region)] = cached
+        continue
+      
+      # Cada región va anidada dos niveles dentro del documento, se agregan 4 espacios
+      # por línea; JSON escapa los saltos de línea dentro de strings así que es seguro
+      fragment = dumps_json(region).replace(b"\n", b"\n    ")
+      fragments[id(region)] = (region, fragment)
+    
+    self._region_fragments = fragments
+    chunks = [b'{\n  "regions": [\n    ']
+    for position, region in enumerate(regions):
+      if position:
+        chunks.append(b",\n    ")
+      chunks.append(fragments[id(region)][1])
+    chunks.append(b"\n  ]\n}")
+    return chunks
+
+# ========================================================================================================
+#                                         GUARDADO DIFERIDO
+# ========================================================================================================
+
+  def _loop_writer(self) -> Dict[str, Any]:
+    # OBTIENE EL EVENTO Y LA TAREA DE ESCRITURA DEL EVENT LOOP ACTUAL
+    # Las primitivas de asyncio quedan ligadas a su loop, otra sesión no las reemplaza
+    loop = asyncio.get_running_loop()
+    writer = self._loop_writers.get(loop)
+    if writer is None:
+      # Se descartan los de loops ya cerrados por asyncio.run anteriores
+      for closed_loop in [known for known in self._loop_writers if known.is_closed()]:
+        del self._loop_writers[closed_loop]
+      writer = self._loop_writers[loop] = {"flush_event": asyncio.Event(), "task": None}
+    return writer
+
+  def _schedule_save(self, region_name: str) -> Path:
+    # MARCA LA REGIÓN COMO MODIFICADA Y ASEGURA UNA TAREA DE ESCRITURA ACTIVA
+    # Varias modificaciones dentro de la ventana se escriben una sola vez
+    writer = self._loop_writer()
+    self._mark_region_dirty(region_name)
+    self._dirty = True
+    
+    if writer["task"] is None or writer["task"].done():
+      writer["flush_event"].clear()
+      writer["task"] = asyncio.create_task(self._writer_loop(writer["flush_event"]))
+    return self.consolidated_file
+
+  async def _writer_loop(self, flush_event: asyncio.Event) -> None:
+    # ESCRIBE LOS CAMBIOS PENDIENTES COMO MÁXIMO UNA VEZ POR VENTANA
+    # flush() adelanta la escritura sin esperar el resto de la ventana
+    while self._dirty:
+      try:
+        await asyncio.wait_for(flush_event.wait(), SAVE_DEBOUNCE_SECONDS)
+      except asyncio.TimeoutError:
+        pass
+      
+      try:
+        if self._dirty:
+          await self._write_data(self.data)
+      except Exception as e:
+        # Los cambios quedan pendientes, flush() reintenta y propaga el error si persiste
+        log.error(f"Error en guardado diferido: {e}")
+        return
+
+  async def flush(self) -> None:
+    # ESCRIBE DE INMEDIATO LOS CAMBIOS PENDIENTES Y ESPERA A LA TAREA DE ESCRITURA
+    # Debe llamarse antes de que termine el asyncio.run que modificó los datos
+    # Si la tarea diferida falló se reintenta aquí y un nuevo error llega al llamador
+    writer = self._loop_writer()
+    if writer["task"] is not None and not writer["task"].done():
+      writer["flush_event"].set()
+      await writer["task"]
+    
+    if self._dirty:
+      await self._write_data(self.data)
+
+# ========================================================================================================
+#                                          MARCA DE TIEMPO
+# ========================================================================================================
+
+  def _now_iso(self) -> str:
+    # RETORNA LA FECHA ACTUAL EN UTC COMO TEXTO ISO REUTILIZÁNDOLA POR 100 MS
+    # Actualizaciones seguidas de muchas atracciones comparten la misma marca
+    now = time.monotonic()
+    cached_at, cached_iso = self._cached_now
+    if now - cached_at < TIMESTAMP_CACHE_SECONDS:
+      return cached_iso
+    
+    now_iso = datetime.now(timezone.utc).isoformat()
+    self._cached_now = (now, now_iso)
+    return now_iso
+
 # ========================================================================================================
 #                                           RECARGAR DATOS
 # ========================================================================================================
@@ -146,6 +445,10 @@ class DataHandler:
   def reload_data(self):
     # RECARGA LOS DATOS DESDE EL ARCHIVO CONSOLIDADO
     self.data = self._load_data()
+    self._build_indexes()
+    self._region_fragments.clear()
+    self._dirty_regions.clear()
+    self._review_positions.clear()
 
 # ========================================================================================================
 #                                        GUARDAR ATRACCIONES
@@ -153,13 +456,23 @@ class DataHandler:
 
   async def save_attractions(self, region_name: str, attractions: List[Dict]) -> Optional[Path]:
     # GUARDA LAS ATRACCIONES PARA UNA REGIÓN ESPECÍFICA
+    # Repetidos dentro del mismo lote se colapsan por URL canónica (o nombre) y gana el último
     region_data = self._find_or_create_region(region_name)
     
-    for attraction in attractions:
-      self._process_attraction(region_data, attraction)
+    incoming = {
+      canonical_url(attraction.get("url")) or attraction.get("place_name"): attraction
+      for attraction in attractions
+    }
+    changed = False
+    for attraction in incoming.values():
+      changed |= self._process_attraction(region_data, attraction)
+    
+    # Un lote sin cambios no marca la región ni reescribe el archivo
+    if not changed:
+      return self.consolidated_file
     
-    region_data["last_attractions_scrape_date"] = datetime.now(timezone.utc).isoformat()
-    return await self.save_data()
+    region_data["last_attractions_scrape_date"] = self._now_iso()
+    return self._schedule_save(region_name)
 
 # ========================================================================================================
 #                                     BUSCAR O CREAR REGIÓN
@@ -167,9 +480,9 @@ class DataHandler:
 
   def _find_or_create_region(self, region_name: str) -> Dict:
     # BUSCA UNA REGIÓN EXISTENTE O LA CREA SI NO EXISTE
-    for region in self.data["regions"]:
-      if region.get("region_name") == region_name:
-        return region
+    region = self._region_index.get(region_name)
+    if region is not None:
+      return region
     
     # Crear nueva región con estructura básica
     new_region = {
@@ -178,23 +491,40 @@ class DataHandler:
       "last_attractions_scrape_date": None
     }
     self.data["regions"].append(new_region)
+    self._region_index[region_name] = new_region
+    self._index_region_attractions(new_region)
+    self._regions_with_data = None
     return new_region
 
 # ========================================================================================================
 #                                        PROCESAR ATRACCIÓN
 # ========================================================================================================
 
-  def _process_attraction(self, region_data: Dict, attraction_data: Dict):
+  def _process_attraction(self, region_data: Dict, attraction_data: Dict) -> bool:
     # PROCESA UNA ATRACCIÓN INDIVIDUAL ACTUALIZANDO O CREANDO
+    # Retorna si la atracción se creó o alguno de sus campos cambió
     url = attraction_data.get("url")
     name = attraction_data.get("place_name")
+    url_index, name_index = self._get_attraction_indexes(region_data)
     
     # Buscar atracción existente por URL o nombre
-    for attraction in region_data.get("attractions", []):
-      if attraction.get("url") == url or attraction.get("attraction_name") == name:
-        # Actualizar datos de atracción existente
-        attraction.update(attraction_data)
-        return
+    attraction = url_index.get(canonical_url(url)) or name_index.get(name)
+    if attraction is not None:
+      # Una variante de la misma URL (seguimiento, mayúsculas, barra final) no
+      # reemplaza la guardada para que el archivo no cambie en cada ejecución
+      stored_url = attraction.get("url")
+      if url and url != stored_url and canonical_url(url) == canonical_url(stored_url):
+        attraction_data = {**attraction_data, "url": stored_url}
+      
+      # Sin diferencias no se toca la atracción existente
+      if all(attraction.get(key) == value for key, value in attraction_data.items()):
+        return False
+      
+      # Actualizar datos de atracción existente
+      attraction.update(attraction_data)
+      url_index.setdefault(canonical_url(attraction.get("url")), attraction)
+      name_index.setdefault(attraction.get("attraction_name"), attraction)
+      return True
     
     # Crear 
     new_attraction = {
@@ -206,10 +536,14 @@ class DataHandler:
       "url": url or "",
       "reviews": [],
       "scraped_reviews_count": 0,
+      "analyzed_reviews_count": 0,
       "english_reviews_count": 0,
       "last_reviews_scrape_date": None
     }
     region_data["attractions"].append(new_attraction)
+    url_index.setdefault(canonical_url(new_attraction["url"]), new_attraction)
+    name_index.setdefault(new_attraction["attraction_name"], new_attraction)
+    return True
 
 # ========================================================================================================
 #                                        ACTUALIZAR RESEÑAS
@@ -228,17 +562,18 @@ class DataHandler:
 
     # Fusionar reseñas existentes con nuevas evitando duplicados
     existing_reviews = attraction.get("reviews", [])
-    merged_reviews = self._merge_reviews(existing_reviews, new_reviews)
+    merged_reviews, analyzed_delta = self._merge_reviews(existing_reviews, new_reviews)
 
-    # Actualizar datos de la atracción
+    # Actualizar datos de la atracción ajustando contadores solo con lo que cambió
     attraction["reviews"] = merged_reviews
     attraction["scraped_reviews_count"] = len(merged_reviews)
-    attraction["last_reviews_scrape_date"] = datetime.now(timezone.utc).isoformat()
+    attraction["analyzed_reviews_count"] = attraction.get("analyzed_reviews_count", 0) + analyzed_delta
+    attraction["last_reviews_scrape_date"] = self._now_iso()
     
     if english_count is not None:
       attraction["english_reviews_count"] = english_count
 
-    return await self.save_data()
+    return self._schedule_save(region_name)
 
 # ========================================================================================================
 #                                      BUSCAR ATRACCIÓN POR URL
@@ -246,30 +581,56 @@ class DataHandler:
 
   def _find_attraction_by_url(self, region_data: Dict, url: str) -> Optional[Dict]:
     # BUSCA UNA ATRACCIÓN POR SU URL DENTRO DE UNA REGIÓN
-    for attraction in region_data.get("attractions", []):
-      if attraction.get("url") == url:
-        return attraction
-    return None
+    url_index, _ = self._get_attraction_indexes(region_data)
+    return url_index.get(canonical_url(url))
+
+# ========================================================================================================
+#                                     CONTADORES DE RESEÑAS
+# ========================================================================================================
+
+  @staticmethod
+  def _refresh_review_counters(attraction: Dict) -> None:
+    # RECALCULA LOS CONTADORES DE RESEÑAS TOTALES Y ANALIZADAS DE UNA ATRACCIÓN
+    # Las estadísticas de región suman estos contadores sin recorrer reseñas
+    reviews = attraction.get("reviews", [])
+    attraction["scraped_reviews_count"] = len(reviews)
+    attraction["analyzed_reviews_count"] = sum(1 for review in reviews if is_review_analyzed(review))
 
 # ========================================================================================================
 #                                         FUSIONAR RESEÑAS
 # ========================================================================================================
 
-  def _merge_reviews(self, existing: List[Dict], new: List[Dict]) -> List[Dict]:
+  def _merge_reviews(self, existing: List[Dict], new: List[Dict]) -> Tuple[List[Dict], int]:
     # FUSIONA LISTAS DE RESEÑAS ELIMINANDO DUPLICADOS
-    existing_map = {}
+    # La lista existente se modifica en su lugar y solo se tocan las posiciones nuevas
+    # Retorna la misma lista existente con las reseñas nuevas agregadas o reemplazadas
+    # y cuánto cambió la cantidad de reseñas con análisis válido
     
-    # Mapear reseñas existentes por clave única
-    for review in existing:
-      key = self._get_review_key(review)
-      existing_map[key] = review
+    # Mapear clave única a la posición de cada reseña existente
+    # Se reutiliza el mapa de la fusión anterior si la lista no cambió de largo
+    cached = self._review_positions.get(id(existing))
+    if cached is not None and cached[0] is existing and len(existing) == cached[2]:
+      existing_positions = cached[1]
+    else:
+      existing_positions = {}
+      for position, review in enumerate(existing):
+        existing_positions.setdefault(self._get_review_key(review), position)
 
-    # Añadir o actualizar con reseñas nuevas
+    # Añadir o reemplazar con reseñas nuevas
+    analyzed_delta = 0
     for review in new:
       key = self._get_review_key(review)
-      existing_map[key] = review
+      position = existing_positions.get(key)
+      analyzed_delta += is_review_analyzed(review)
+      if position is None:
+        existing_positions[key] = len(existing)
+        existing.append(review)
+      else:
+        analyzed_delta -= is_review_analyzed(existing[position])
+        existing[position] = review
 
-    return list(existing_map.values())
+    self._review_positions[id(existing)] = (existing, existing_positions, len(existing))
+    return existing, analyzed_delta
 
 # ========================================================================================================
 #                                        OBTENER CLAVE RESEÑA
@@ -277,17 +638,7 @@ class DataHandler:
 
   def _get_review_key(self, review: Dict) -> str:
     # GENERA UNA CLAVE ÚNICA PARA IDENTIFICAR RESEÑAS
-    if review_id := review.get("review_id"):
-      return str(review_id)
-    
-    # Fallback usando hash del contenido principal
-    content = (
-      review.get('username', '').strip().lower(),
-      review.get('title', '').strip().lower(),
-      review.get('written_date', ''),
-      str(review.get('rating', ''))
-    )
-    return str(hash(content))
+    return review_key(review)
 
 # ========================================================================================================
 #                                    ACTUALIZAR ATRACCIONES REGIÓN
@@ -295,17 +646,21 @@ class DataHandler:
 
   def update_region_attractions(self, region_name: str, attractions_data: List[Dict]) -> None:
     # ACTUALIZA LAS ATRACCIONES DE UNA REGIÓN DESPUÉS DEL ANÁLISIS
-    try:
-      # Buscar la región específica en los datos
-      for region in self.data.get("regions", []):
-        if region.get("region_name") == region_name:
-          region["attractions"] = attractions_data
-          log.debug(f"Región '{region_name}' actualizada con {len(attractions_data)} atracciones")
-          return
-      
+    # Los errores inesperados se propagan al llamador, que ya los registra
+    region = self._region_index.get(region_name)
+    if region is None:
       log.warning(f"Región '{region_name}' no encontrada para actualizar")
-    except Exception as e:
-      log.error(f"Error actualizando atracciones de '{region_name}': {e}")
+      return
+    
+    region["attractions"] = attractions_data
+    self._index_region_attractions(region)
+    self._mark_region_dirty(region_name)
+    self._review_positions.clear()
+    
+    # El análisis asigna sentimientos directamente en las reseñas
+    for attraction in attractions_data:
+      self._refresh_review_counters(attraction)
+    log.debug(f"Región '{region_name}' actualizada con {len(attractions_data)} atracciones")
 
 # ========================================================================================================
 #                                   ACTUALIZAR FECHA ANÁLISIS
@@ -313,16 +668,14 @@ class DataHandler:
 
   def update_region_analysis_date(self, region_name: str, analysis_date: str) -> None:
     # ACTUALIZA LA FECHA DE ÚLTIMO ANÁLISIS DE SENTIMIENTOS
-    try:
-      for region in self.data.get("regions", []):
-        if region.get("region_name") == region_name:
-          region["last_analyzed_date"] = analysis_date
-          log.debug(f"Fecha de análisis actualizada para '{region_name}'")
-          return
-      
+    region = self._region_index.get(region_name)
+    if region is None:
       log.warning(f"Región '{region_name}' no encontrada para fecha")
-    except Exception as e:
-      log.error(f"Error actualizando fecha de '{region_name}': {e}")
+      return
+    
+    region["last_analyzed_date"] = analysis_date
+    self._mark_region_dirty(region_name)
+    log.debug(f"Fecha de análisis actualizada para '{region_name}'")
 
 # ========================================================================================================
 #                                   OBTENER ESTADÍSTICAS ANÁLISIS
@@ -339,15 +692,10 @@ class DataHandler:
         "last_analyzed_date": None
       }
     
-    total_reviews = 0
-    analyzed_reviews = 0
-    
-    # Contar reseñas totales y analizadas
-    for attraction in region_data.get("attractions", []):
-      for review in attraction.get("reviews", []):
-        total_reviews += 1
-        if review.get("sentiment"):
-          analyzed_reviews += 1
+    # Suma contadores mantenidos al cargar, fusionar y analizar reseñas
+    attractions = region_data.get("attractions", [])
+    total_reviews = sum(attraction.get("scraped_reviews_count", 0) for attraction in attractions)
+    analyzed_reviews = sum(attraction.get("analyzed_reviews_count", 0) for attraction in attractions)
     
     return {
       "total_reviews": total_reviews,
@@ -362,9 +710,11 @@ class DataHandler:
 
   async def export_regions(self, region_names: List[str], format: str = "excel") -> Optional[Path]:
     # EXPORTA REGIONES SELECCIONADAS EN EL FORMATO ESPECIFICADO
+    # Busca cada nombre pedido en el índice, sin repetir ni recorrer todas las regiones
     selected_regions = [
-      region for region in self.data.get("regions", [])
-      if region.get("region_name") in region_names
+      self._region_index[region_name]
+      for region_name in dict.fromkeys(region_names)
+      if region_name in self._region_index
     ]
 
     if not selected_regions:
@@ -10,9 +10,11 @@ import httpx
 from loguru import logger as log
 from parsel import Selector
 
+from .data_handler import review_key
 from .metrics import ReviewMetricsCalculator
 from .parsers import ReviewParser, ReviewParserConfig
 from ..utils import get_headers, smart_sleep, HEADERS, BASE_URL
+from ..utils.json_io import read_json, write_json_atomic
 
 # ========================================================================================================
 #                                        SCRAPER DE ATRACCIONES
@@ -479,7 +481,7 @@ class ReviewScraper:
       }
 
     # Generación de hashes para detectar duplicados
-    processed_review_hashes: Set[int] = {self._generate_review_hash(r) for r in stored_reviews_from_json if isinstance(r, dict)}
+    processed_review_hashes: Set[str] = {self._generate_review_hash(r) for r in stored_reviews_from_json if isinstance(r, dict)}
     
     # Verificación si ya está completamente actualizada
     if current_site_english_reviews == stored_english_count and len(processed_review_hashes) >= current_site_english_reviews:
@@ -758,19 +760,10 @@ class ReviewScraper:
 #                                        GENERAR HASH RESEÑA
 # ========================================================================================================
 
-  def _generate_review_hash(self, review: Dict) -> int:
-    # CREA UN HASH ÚNICO PARA IDENTIFICAR RESEÑAS DUPLICADAS
-    review_id_from_parser = review.get("review_id")
-    if review_id_from_parser:
-      return hash(str(review_id_from_parser))
-    
-    # Fallback usando campos clave para generar hash
-    key_fields = (
-      review.get('username', '').strip().lower(),
-      review.get('title', '').strip().lower(),
-      review.get('written_date', ''),
-    )
-    return hash(key_fields)
+  def _generate_review_hash(self, review: Dict) -> str:
+    # CREA UNA CLAVE ÚNICA PARA IDENTIFICAR RESEÑAS DUPLICADAS
+    # Usa la misma clave estable que DataHandler para que ambos dedupliquen igual
+    return review_key(review)
 
 # ========================================================================================================
 #                                       OBTENER MÉTRICAS RESEÑAS
@@ -837,12 +830,9 @@ class ReviewScraper:
         # Carga de datos existentes desde archivo
         try:
           if os.path.exists(self.json_output_filepath) and os.path.getsize(self.json_output_filepath) > 0:
-            with open(self.json_output_filepath, 'r', encoding='utf-8') as f:
-              content = f.read()
-              if content.strip():
-                loaded_json = json.loads(content)
-                if isinstance(loaded_json, dict) and "regions" in loaded_json and isinstance(loaded_json["regions"], list):
-                  full_data = loaded_json
+            loaded_json = read_json(self.json_output_filepath)
+            if isinstance(loaded_json, dict) and "regions" in loaded_json and isinstance(loaded_json["regions"], list):
+              full_data = loaded_json
         except json.JSONDecodeError:
           log.warning(f"Error decodificando JSON desde {self.json_output_filepath}")
         except Exception as e:
@@ -929,8 +919,7 @@ class ReviewScraper:
 
         # Escritura de archivo JSON
         try:
-          with open(self.json_output_filepath, 'w', encoding='utf-8') as f:
-            json.dump(full_data, f, ensure_ascii=False, indent=2)
+          write_json_atomic(self.json_output_filepath, full_data)
         except IOError as e:
           log.error(f"Error E/O escribiendo JSON: {e}")
         except Exception as e:
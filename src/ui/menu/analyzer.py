@@ -6,10 +6,15 @@ from typing import List, Tuple
 import streamlit as st 
 import asyncio
 from src.core.analyzer import load_analyzer
+from src.core.data_handler import is_review_analyzed
 from loguru import logger as log
 import pandas as pd
 from datetime import datetime, timezone
 import re
+import time
+
+# segundos mínimos entre guardados parciales durante el análisis de una región
+CHECKPOINT_INTERVAL_SECONDS = 30
 
 # ====================================================================================================================
 #                                          OBTENER TIEMPO RELATIVO
@@ -203,15 +208,9 @@ def display_current_stats(data_handler, region_names_to_show: List[str]):
     if not current_region_name_spanish or current_region_name_spanish not in region_names_to_show:
       continue
             
-    # contar reseñas analizadas vs pendientes por región
-    analyzed_count = 0
-    not_analyzed_count = 0
-    for attraction_item in region_data_item.get("attractions", []):
-      for review_item in attraction_item.get("reviews", []):
-        if review_item.get("sentiment"):
-          analyzed_count += 1
-        else:
-          not_analyzed_count += 1
+    # conteos de reseñas analizadas vs pendientes desde los contadores por atracción
+    # que mantiene el data handler, sin recorrer cada reseña
+    region_stats = data_handler.get_region_analysis_stats(current_region_name_spanish)
     
     # obtener fecha de último análisis y convertir a formato relativo
     last_analyzed_date = region_data_item.get("last_analyzed_date", "Nunca")
@@ -220,8 +219,8 @@ def display_current_stats(data_handler, region_names_to_show: List[str]):
     # agregar fila completa con estadísticas procesadas
     stats.append({
       "Región": current_region_name_spanish,
-      "Reseñas analizadas": analyzed_count,
-      "Reseñas pendientes": not_analyzed_count,
+      "Reseñas analizadas": region_stats["analyzed_reviews"],
+      "Reseñas pendientes": region_stats["pending_reviews"],
       "Último análisis": relative_time
     })
     
@@ -260,13 +259,6 @@ async def run_analysis_for_one_region(data_handler, analyzer, region_name_spanis
       log.error(f"Región '{region_name_spanish}' no encontrada")
       return False, 0
 
-    # contar reseñas pendientes de análisis en región
-    pending_reviews_in_region = 0
-    for attraction in region_data_to_analyze.get("attractions", []):
-      for review in attraction.get("reviews", []):
-        if not review.get("sentiment"):
-          pending_reviews_in_region += 1
-
     # crear callback que actualice progreso de UI y verifique detención
     def ui_progress_callback(progress_value, status_text):
       # verificar si se debe detener durante procesamiento
@@ -278,10 +270,24 @@ async def run_analysis_for_one_region(data_handler, analyzer, region_name_spanis
         progress_callback(progress_value, status_text)
       return True  # continuar procesamiento
 
+    # guardar avance parcial periódicamente para no repetir análisis si el proceso se cae
+    last_checkpoint_time = time.monotonic()
+
+    async def persist_partial_attraction(attraction_index, analyzed_attraction):
+      nonlocal last_checkpoint_time
+      region_data_to_analyze["attractions"][attraction_index] = analyzed_attraction
+      
+      if time.monotonic() - last_checkpoint_time >= CHECKPOINT_INTERVAL_SECONDS:
+        await data_handler.save_data(region_name=region_name_spanish)
+        last_checkpoint_time = time.monotonic()
+        log.debug(f"Avance parcial de '{region_name_spanish}' guardado")
+
     # ejecutar análisis de región con callback de progreso
-    analyzed_region_data_dict = await analyzer.analyze_region_reviews(
+    # el analizador retorna directamente cuántas reseñas procesó
+    analyzed_region_data_dict, newly_analyzed_count = await analyzer.analyze_region_reviews(
       region_data_to_analyze, 
       progress_callback=ui_progress_callback,
+      persist_callback=persist_partial_attraction,
     )
 
     # verificar si se detuvo durante el análisis
@@ -302,10 +308,10 @@ async def run_analysis_for_one_region(data_handler, analyzer, region_name_spanis
 
     # actualizar datos analizados en data handler
     data_handler.update_region_attractions(region_name_spanish, analyzed_region_data_dict["attractions"])
-    await data_handler.save_data()
+    await data_handler.save_data(region_name=region_name_spanish)
     
     # contabilizar reseñas procesadas para estadísticas
-    reviews_processed_count = pending_reviews_in_region
+    reviews_processed_count = newly_analyzed_count
     log.info(f"Región '{region_name_spanish}' analizada: {reviews_processed_count} reseñas")
     return True, reviews_processed_count
 
@@ -357,7 +363,7 @@ async def analyze_reviews_ui(data_handler, analyzer, selected_region_ui: str):
       if region_data_iter:
         for attraction_iter in region_data_iter.get("attractions", []):
           for review_iter in attraction_iter.get("reviews", []):
-            if not review_iter.get("sentiment"):
+            if not is_review_analyzed(review_iter):
               total_reviews_to_analyze_overall += 1
         
     # validar que hay reseñas pendientes de análisis
@@ -244,11 +244,8 @@ def _run_scraping_sync(data_handler, region_configs, region_name, progress_conta
             st.session_state.scraping['atracciones'].extend(page_data)
             total_attractions += len(page_data)
             
-            # persistir progreso inmediatamente para evitar pérdida de datos
-            await data_handler.save_attractions(
-              region_name, 
-              st.session_state.scraping['atracciones']
-            )
+            # persistir solo la página nueva, las anteriores ya están en el handler
+            await data_handler.save_attractions(region_name, page_data)
           
           # actualizar barra de progreso con máximo del 90% hasta completar
           progress_bar.progress(min(page_count * 0.1, 0.9))
@@ -270,16 +267,12 @@ def _run_scraping_sync(data_handler, region_configs, region_name, progress_conta
           # pausa inteligente entre páginas para evitar detección anti-bot
           await asyncio.sleep(1.5)
         
+        # escribir cambios pendientes antes de informar éxito, un error de disco cae al except
+        await data_handler.flush()
+        
         # completar barra de progreso al 100% al finalizar
         progress_bar.progress(1.0)
         
-        # guardar datos finales y recargar para actualizar tabla
-        if st.session_state.scraping['atracciones']:
-          await data_handler.save_attractions(
-            region_name, 
-            st.session_state.scraping['atracciones']
-          )
-        
         # mostrar resumen final usando mismo placeholder para consistencia
         status_placeholder.success(f"""
         **Scraping Completado:**
@@ -295,6 +288,13 @@ def _run_scraping_sync(data_handler, region_configs, region_name, progress_conta
       log.error(f"Error en scraping asíncrono: {e}")
       status_placeholder.error(f"Error durante scraping: {str(e)}")
       return False
+    finally:
+      # escribir cambios pendientes antes de que asyncio.run cierre el loop
+      # tras un error se intenta guardar lo ya scrapeado sin ocultar el error original
+      try:
+        await data_handler.flush()
+      except Exception as e:
+        log.error(f"Error guardando cambios pendientes: {e}")
   
   # ejecutar asíncrono usando asyncio.run para compatibilidad con Streamlit
   return asyncio.run(scraping_coroutine())
@@ -10,6 +10,7 @@ from datetime import datetime, timezone, timedelta
 import json 
 from io import BytesIO 
 from ...utils.constants import PathConfig
+from ...utils.json_io import read_json
 
 # orden predefinido para categorías de sentimiento en interfaz
 SENTIMENT_ORDER = ["VERY_NEGATIVE", "NEGATIVE", "NEUTRAL", "POSITIVE", "VERY_POSITIVE"]
@@ -45,8 +46,7 @@ def load_and_process_data():
   consolidated_file_path = path_config.CONSOLIDATED_JSON
 
   try:
-    with open(consolidated_file_path, 'r', encoding='utf-8') as f:
-      data = json.load(f)
+    data = read_json(consolidated_file_path)
   except FileNotFoundError:
     st.error(f"Error: No se encontró el archivo de datos en {consolidated_file_path}")
     return pd.DataFrame()
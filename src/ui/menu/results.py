@@ -232,7 +232,10 @@ def _process_review_for_stats(review: Dict, stats: Dict) -> None:
     processed_sentiment = _normalize_sentiment(sentiment_value)
     if processed_sentiment and processed_sentiment in stats["sentiment_summary"]:
       stats["sentiment_summary"][processed_sentiment] += 1
-      stats["sentiment_scores"].append(3.0 if processed_sentiment == "POSITIVE" else 1.0)
+      if sentiment_score is not None:
+        stats["sentiment_scores"].append(float(sentiment_score))
+      else:
+        stats["sentiment_scores"].append(SENTIMENT_VALUES[processed_sentiment])
   
   # procesar rating individual en escala 1-5
   if isinstance(rating, (int, float)) and 1 <= rating <= 5:
@@ -248,19 +251,15 @@ def _process_review_for_stats(review: Dict, stats: Dict) -> None:
 # ====================================================================================================================
 
 def _normalize_sentiment(sentiment_value) -> Optional[str]:
-  # NORMALIZA VALORES DE SENTIMIENTO PARA COMPATIBILIDAD CON VERSIONES ANTERIORES
-  # Convierte formatos antiguos de sentimiento a formato estándar
+  # NORMALIZA VALORES DE SENTIMIENTO A LAS ETIQUETAS ESTÁNDAR EN MAYÚSCULAS
+  # Solo llegan reseñas que pasaron _has_sentiment_analysis, es decir variantes de
+  # mayúsculas de las cinco etiquetas estándar
   # Retorna valor normalizado o None si no se puede procesar
   if not isinstance(sentiment_value, str):
     return None
   
-  sentiment_upper = sentiment_value.upper()
-  if "POSITIVE" in sentiment_upper:
-    return "POSITIVE"
-  elif "NEGATIVE" in sentiment_upper:
-    return "NEGATIVE"
-  
-  return None
+  sentiment_upper = sentiment_value.strip().upper()
+  return sentiment_upper if sentiment_upper in SENTIMENT_VALUES else None
 
 # ====================================================================================================================
 #                                    CALCULAR CORRELACIÓN RATING-SENTIMIENTO
@@ -622,11 +621,9 @@ def _prepare_export_data(data_handler, selected_region_name: str) -> Dict:
   if selected_region_name == "Todas las regiones":
     return {"regions": data_handler.data.get("regions", [])}
   else:
-    filtered_regions = [
-      r for r in data_handler.data.get("regions", [])
-      if r.get("region_name") == selected_region_name
-    ]
-    return {"regions": filtered_regions}
+    # se comparten las regiones por referencia, el exportador solo las lee
+    region = data_handler.get_region_data(selected_region_name)
+    return {"regions": [region] if region else []}
 
 # ====================================================================================================================
 #                                         GENERAR NOMBRE DE ARCHIVO
@@ -55,6 +55,9 @@ class PathConfig:
   
   # directorio para almacenar archivos de log del sistema
   LOGS_DIR = PROJECT_ROOT / "logs"
+  
+  # directorio para modelos exportados localmente (ONNX)
+  MODELS_DIR = PROJECT_ROOT / "models"
 
 # ====================================================================================================================
 #                                              FUNCIONES AUXILIARES
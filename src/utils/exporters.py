@@ -2,12 +2,13 @@
 # Implementa generación de archivos Excel y JSON desde estructura de datos consolidada
 # Proporciona funciones para convertir datos jerárquicos a formatos de descarga
 
-import json
 from typing import Dict, Optional
 from io import BytesIO
 import pandas as pd
 from loguru import logger as log
 
+from .json_io import dumps_json
+
 # ====================================================================================================================
 #                                           CLASE PRINCIPAL DE EXPORTACIÓN
 # ====================================================================================================================
@@ -142,8 +143,8 @@ class DataExporter:
 
     try:
       # serializar datos a JSON con formato legible y caracteres especiales
-      json_content = json.dumps(data_package, indent=2, ensure_ascii=False)
-      json_bytes = json_content.encode('utf-8')
+      # usa orjson si está disponible, mismo formato que el archivo consolidado
+      json_bytes = dumps_json(data_package)
       log.info(f"JSON generado exitosamente: {len(json_bytes)} bytes")
       return json_bytes
     except Exception as e:
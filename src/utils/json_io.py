@@ -0,0 +1,72 @@
+# MÓDULO DE LECTURA Y ESCRITURA RÁPIDA DE ARCHIVOS JSON
+# Usa orjson cuando está instalado y cae a la librería estándar si no
+# Proporciona escritura atómica para no dejar archivos a medio escribir
+
+import json
+import mmap
+import os
+from pathlib import Path
+from typing import Any, Iterable, Union
+
+try:
+  import orjson
+except ImportError:  # orjson es opcional, json estándar produce el mismo formato
+  orjson = None
+
+# ====================================================================================================================
+#                                            SERIALIZAR Y DESERIALIZAR
+# ====================================================================================================================
+
+def dumps_json(data: Any) -> bytes:
+  # SERIALIZA DATOS A JSON UTF-8 CON INDENTACIÓN DE 2 ESPACIOS
+  # Mantiene el formato legible del archivo consolidado con ambos motores
+  if orjson is not None:
+    return orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+  return json.dumps(data, indent=2, ensure_ascii=False).encode("utf-8")
+
+def loads_json(raw: Union[bytes, str]) -> Any:
+  # DESERIALIZA CONTENIDO JSON DESDE BYTES O TEXTO
+  if orjson is not None:
+    return orjson.loads(raw)
+  return json.loads(raw)
+
+# ====================================================================================================================
+#                                              LEER Y ESCRIBIR ARCHIVOS
+# ====================================================================================================================
+
+def read_json(path: Union[str, Path]) -> Any:
+  # LEE Y DESERIALIZA UN ARCHIVO JSON COMPLETO
+  # Con orjson el archivo se mapea en memoria y se parsea sin copiarlo a un bytes
+  # del tamaño del archivo, las páginas las administra el sistema operativo
+  with open(path, "rb") as f:
+    if orjson is None or os.fstat(f.fileno()).st_size == 0:
+      return loads_json(f.read())
+    
+    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+      with memoryview(mapped) as view:
+        return orjson.loads(view)
+
+def write_bytes_atomic(path: Union[str, Path], payload: bytes) -> None:
+  # ESCRIBE BYTES EN UN ARCHIVO TEMPORAL Y LO RENOMBRA SOBRE EL DESTINO
+  write_chunks_atomic(path, (payload,))
+
+def write_chunks_atomic(path: Union[str, Path], chunks: Iterable[bytes]) -> None:
+  # ESCRIBE VARIOS BLOQUES DE BYTES SEGUIDOS SIN UNIRLOS PRIMERO EN MEMORIA
+  # os.replace es atómico, un lector ve el archivo anterior o el nuevo, nunca uno cortado
+  # fsync asegura que el contenido nuevo esté en disco antes de reemplazar el anterior
+  tmp_path = f"{path}.tmp"
+  try:
+    with open(tmp_path, "wb", buffering=1024 * 1024) as f:
+      f.writelines(chunks)
+      f.flush()
+      os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+  except BaseException:
+    # No deja temporales a medio escribir si la escritura falla
+    if os.path.exists(tmp_path):
+      os.remove(tmp_path)
+    raise
+
+def write_json_atomic(path: Union[str, Path], data: Any) -> None:
+  # SERIALIZA Y ESCRIBE DATOS JSON DE FORMA ATÓMICA
+  write_bytes_atomic(path, dumps_json(data))